@@ -1,8 +1,10 @@
+import threading
 from typing import Dict, List, Union
 
 import multitasking
 import pandas as pd
-import requests
+
+from ..config import MAX_CONNECTIONS
 
 from ..common import get_deal_detail as get_deal_detail_for_bond
 from ..common import get_history_bill as get_history_bill_for_bond
@@ -10,6 +12,7 @@ from ..common import get_quote_history as get_quote_history_for_bond
 from ..common import get_realtime_quotes_by_fs
 from ..common import get_today_bill as get_today_bill_for_bond
 from ..common.config import EASTMONEY_REQUEST_HEADERS, FS_DICT, MagicConfig
+from ..shared import session
 from ..utils import get_quote_id, process_dataframe_and_series, to_numeric
 from .config import EASTMONEY_BOND_BASE_INFO_FIELDS
 
@@ -39,7 +42,7 @@ def get_base_info_single(bond_code: str) -> pd.Series:
     )
 
     url = 'http://datacenter-web.eastmoney.com/api/data/v1/get'
-    json_response = requests.get(
+    json_response = session.get(
         url, headers=EASTMONEY_REQUEST_HEADERS, params=params
     ).json()
     if json_response['result'] is None:
@@ -65,13 +68,18 @@ def get_base_info_multi(bond_codes: List[str]) -> pd.DataFrame:
         多只债券信息
     """
     ss = []
+    semaphore = threading.BoundedSemaphore(MAX_CONNECTIONS)
 
     @multitasking.task
     def start(bond_code: str) -> None:
-        s = get_base_info_single(bond_code)
-        ss.append(s)
+        try:
+            s = get_base_info_single(bond_code)
+            ss.append(s)
+        finally:
+            semaphore.release()
 
     for bond_code in bond_codes:
+        semaphore.acquire()
         start(bond_code)
     multitasking.wait_for_tasks()
     df = pd.DataFrame(ss)
@@ -173,7 +181,7 @@ def get_all_base_info() -> pd.DataFrame:
         )
 
         url = 'http://datacenter-web.eastmoney.com/api/data/v1/get'
-        json_response = requests.get(
+        json_response = session.get(
             url, headers=EASTMONEY_REQUEST_HEADERS, params=params
         ).json()
         if json_response['result'] is None:
@@ -0,0 +1,96 @@
+import sqlite3
+import threading
+from datetime import datetime
+from typing import List, Tuple, Union
+
+from ..config import DATA_DIR
+
+# K 线磁盘缓存位置
+KLINE_CACHE_PATH = str(DATA_DIR / 'kline-cache.db')
+
+_lock = threading.Lock()
+_connection: sqlite3.Connection = None
+
+
+def _get_connection() -> sqlite3.Connection:
+    global _connection
+    if _connection is None:
+        # NOTE 多任务场景里会从工作线程读写 访问统一由 _lock 串行化
+        _connection = sqlite3.connect(KLINE_CACHE_PATH, check_same_thread=False)
+        _connection.execute(
+            'CREATE TABLE IF NOT EXISTS kline ('
+            'quote_id TEXT, klt INTEGER, fqt INTEGER, beg TEXT, end TEXT, '
+            'name TEXT, klines TEXT, '
+            'PRIMARY KEY (quote_id, klt, fqt, beg, end))'
+        )
+        _connection.commit()
+    return _connection
+
+
+def is_immutable_kline_window(end: str, fqt: int) -> bool:
+    """
+    判断一段 K 线查询窗口是否不会再变化 从而可以安全地落盘缓存
+
+    仅当结束日期严格早于今天(历史数据已定型)
+    且复权方式为不复权或后复权(前复权数值会随后续除权除息整体变化)时成立
+
+    Parameters
+    ----------
+    end : str
+        结束日期 格式形如 ``'20210101'``
+    fqt : int
+        复权方式
+
+    Returns
+    -------
+    bool
+
+    """
+    if fqt == 1:
+        return False
+    today = datetime.today().strftime('%Y%m%d')
+    return str(end) < today
+
+
+def load_klines(
+    quote_id: str, klt: int, fqt: int, beg: str, end: str
+) -> Union[Tuple[str, List[str]], None]:
+    """
+    读取缓存的 K 线数据
+
+    Returns
+    -------
+    Union[Tuple[str, List[str]], None]
+        命中时为 ``(名称, 原始 K 线行列表)`` 未命中时为 ``None``
+
+    """
+    with _lock:
+        row = (
+            _get_connection()
+            .execute(
+                'SELECT name, klines FROM kline '
+                'WHERE quote_id=? AND klt=? AND fqt=? AND beg=? AND end=?',
+                (quote_id, klt, fqt, beg, end),
+            )
+            .fetchone()
+        )
+    if row is None:
+        return None
+    name, klines = row
+    return name, klines.split('\n')
+
+
+def save_klines(
+    quote_id: str, klt: int, fqt: int, beg: str, end: str, name: str, klines: List[str]
+) -> None:
+    """
+    将一段不会再变化的 K 线数据写入缓存
+
+    """
+    with _lock:
+        connection = _get_connection()
+        connection.execute(
+            'INSERT OR REPLACE INTO kline VALUES (?,?,?,?,?,?,?)',
+            (quote_id, klt, fqt, beg, end, name, '\n'.join(klines)),
+        )
+        connection.commit()
@@ -1,16 +1,17 @@
+import asyncio
+import io
+import threading
 from datetime import datetime
-from typing import Dict, List, Union
+from typing import Awaitable, Dict, List, Tuple, Union
 
-import multitasking
+import aiohttp
 import pandas as pd
-from jsonpath import jsonpath
-from retry import retry
 from tqdm import tqdm
-import time
 
 from ..common.config import MARKET_NUMBER_DICT
 from ..shared import BASE_INFO_CACHE, session, MAX_CONNECTIONS
 from ..utils import get_quote_id, to_numeric
+from .cache import is_immutable_kline_window, load_klines, save_klines
 from .config import (
     EASTMONEY_BASE_INFO_FIELDS,
     EASTMONEY_HISTORY_BILL_FIELDS,
@@ -24,6 +25,161 @@ from .config import (
 import warnings
 warnings.filterwarnings("once")
 
+# 各接口请求参数中不随调用变化的部分 在模块加载时编码一次
+EASTMONEY_CLIST_BASE_PARAMS = (
+    ('pn', '1'),
+    ('pz', '1000000'),
+    ('po', '1'),
+    ('np', '1'),
+    ('fltt', '2'),
+    ('invt', '2'),
+    ('fid', 'f3'),
+)
+EASTMONEY_KLINE_BASE_PARAMS = (
+    ('fields1', 'f1,f2,f3,f4,f5,f6,f7,f8,f9,f10,f11,f12,f13'),
+    ('fields2', ",".join(EASTMONEY_KLINE_FIELDS.keys())),
+    ('rtntype', '6'),
+)
+EASTMONEY_HISTORY_BILL_BASE_PARAMS = (
+    ('lmt', '100000'),
+    ('klt', '101'),
+    ('fields1', 'f1,f2,f3,f7'),
+    ('fields2', ",".join(EASTMONEY_HISTORY_BILL_FIELDS.keys())),
+)
+EASTMONEY_TODAY_BILL_BASE_PARAMS = (
+    ('lmt', '0'),
+    ('klt', '1'),
+    ('fields1', 'f1,f2,f3,f7'),
+    ('fields2', 'f51,f52,f53,f54,f55,f56,f57,f58,f59,f60,f61,f62,f63'),
+)
+EASTMONEY_BASE_INFO_BASE_PARAMS = (
+    ('ut', 'fa5fd1943c7b386f172d6893dbfba10b'),
+    ('invt', '2'),
+    ('fltt', '2'),
+    ('fields', ",".join(EASTMONEY_BASE_INFO_FIELDS.keys())),
+)
+EASTMONEY_ULIST_BASE_PARAMS = (
+    ('OSVersion', '14.3'),
+    ('appVersion', '6.3.8'),
+    ('fltt', '2'),
+    ('plat', 'Iphone'),
+    ('product', 'EFund'),
+    ('serverVersion', '6.3.6'),
+    ('version', '6.3.8'),
+)
+EASTMONEY_KLINE_NDAYS_BASE_PARAMS = (
+    ('fields1', 'f1,f2,f3,f4,f5,f6,f7,f8,f9,f10,f11,f12,f13'),
+    ('fields2', ",".join(EASTMONEY_KLINE_NDAYS_FIELDS.keys())),
+    ('iscr', '0'),
+    ('iscca', '0'),
+)
+# 各接口返回数据的表头 同样由字段映射在模块加载时计算一次
+# FULL 版本带上最前面的名称和代码两列 用于返回空表的场景
+EASTMONEY_KLINE_COLUMNS = tuple(EASTMONEY_KLINE_FIELDS.values())
+EASTMONEY_KLINE_FULL_COLUMNS = ('名称', '代码') + EASTMONEY_KLINE_COLUMNS
+EASTMONEY_HISTORY_BILL_COLUMNS = tuple(EASTMONEY_HISTORY_BILL_FIELDS.values())
+EASTMONEY_HISTORY_BILL_FULL_COLUMNS = ('名称', '代码') + EASTMONEY_HISTORY_BILL_COLUMNS
+EASTMONEY_TODAY_BILL_COLUMNS = ('时间', '主力净流入', '小单净流入', '中单净流入', '大单净流入', '超大单净流入')
+EASTMONEY_TODAY_BILL_FULL_COLUMNS = ('名称', '代码') + EASTMONEY_TODAY_BILL_COLUMNS
+EASTMONEY_KLINE_NDAYS_COLUMNS = tuple(EASTMONEY_KLINE_NDAYS_FIELDS.values())
+EASTMONEY_KLINE_NDAYS_FULL_COLUMNS = ('名称', '代码') + EASTMONEY_KLINE_NDAYS_COLUMNS
+
+
+def new_client_session() -> aiohttp.ClientSession:
+    """
+    创建多任务请求专用的 aiohttp 会话(共享连接池、启用 DNS 缓存)
+
+    Returns
+    -------
+    aiohttp.ClientSession
+
+    """
+    connector = aiohttp.TCPConnector(
+        limit=MAX_CONNECTIONS, ttl_dns_cache=300, ssl=False
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        headers=EASTMONEY_REQUEST_HEADERS,
+        timeout=aiohttp.ClientTimeout(total=180),
+    )
+
+
+async def fetch_json(
+    client: aiohttp.ClientSession,
+    url: str,
+    params: Tuple[Tuple[str, str], ...] = None,
+    json: dict = None,
+    method: str = 'GET',
+    tries: int = 3,
+    delay: int = 1,
+) -> dict:
+    """
+    在协程中请求并解析 json 数据 失败时自动重试
+
+    Parameters
+    ----------
+    client : aiohttp.ClientSession
+        共用的 aiohttp 会话
+    url : str
+        请求地址
+    params : Tuple[Tuple[str, str], ...], optional
+        查询参数
+    json : dict, optional
+        作为请求体的 json 数据
+    method : str, optional
+        请求方法, 默认为 ``'GET'``
+    tries : int, optional
+        最大尝试次数, 默认为 ``3``
+    delay : int, optional
+        重试间隔秒数, 默认为 ``1``
+
+    Returns
+    -------
+    dict
+
+    """
+    for count in range(tries):
+        try:
+            async with client.request(
+                method,
+                url,
+                params=list(params) if params is not None else None,
+                json=json,
+            ) as response:
+                return await response.json(content_type=None)
+        except Exception:
+            if count == tries - 1:
+                raise
+            await asyncio.sleep(delay)
+
+
+def run_coroutine(coro: Awaitable):
+    """
+    同步执行协程
+
+    在普通环境里直接交给 ``asyncio.run``
+    若当前线程已存在运行中的事件循环(例如 Jupyter) 则在新线程的新事件循环中执行
+
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    result: dict = {}
+
+    def runner() -> None:
+        loop = asyncio.new_event_loop()
+        try:
+            result['value'] = loop.run_until_complete(coro)
+        finally:
+            loop.close()
+
+    thread = threading.Thread(target=runner)
+    thread.start()
+    thread.join()
+    return result['value']
+
+
 @to_numeric
 def get_realtime_quotes_by_fs(fs: str, **kwargs) -> pd.DataFrame:
     """
@@ -38,14 +194,7 @@ def get_realtime_quotes_by_fs(fs: str, **kwargs) -> pd.DataFrame:
 
     columns = {**EASTMONEY_QUOTE_FIELDS, **kwargs.get(MagicConfig.EXTRA_FIELDS, {})}
     fields = ",".join(columns.keys())
-    params = (
-        ('pn', '1'),
-        ('pz', '1000000'),
-        ('po', '1'),
-        ('np', '1'),
-        ('fltt', '2'),
-        ('invt', '2'),
-        ('fid', 'f3'),
+    params = EASTMONEY_CLIST_BASE_PARAMS + (
         ('fs', fs),
         ('fields', fields),
     )
@@ -53,9 +202,10 @@ def get_realtime_quotes_by_fs(fs: str, **kwargs) -> pd.DataFrame:
     json_response = session.get(
         url, headers=EASTMONEY_REQUEST_HEADERS, params=params
     ).json()
-    df = pd.DataFrame(json_response['data']['diff'])
-    df = df.rename(columns=columns)
-    df: pd.DataFrame = df[columns.values()]
+    diff: List[dict] = json_response['data']['diff']
+    # NOTE 按列构造 避免 list-of-dict 构造时的 block 合并以及约两倍的临时内存峰值
+    data = {field: [item.get(field) for item in diff] for field in columns.keys()}
+    df: pd.DataFrame = pd.DataFrame(data).rename(columns=columns)
     df['行情ID'] = df['市场编号'].astype(str) + '.' + df['代码'].astype(str)
     df['市场类型'] = df['市场编号'].astype(str).apply(lambda x: MARKET_NUMBER_DICT.get(x))
     df['更新时间'] = df['更新时间戳'].apply(lambda x: str(datetime.fromtimestamp(x)))
@@ -67,7 +217,58 @@ def get_realtime_quotes_by_fs(fs: str, **kwargs) -> pd.DataFrame:
     return df
 
 
+EASTMONEY_KLINE_URL = 'https://push2his.eastmoney.com/api/qt/stock/kline/get'
+
+
+def gen_kline_params(
+    quote_id: str, beg: str, end: str, klt: int, fqt: int
+) -> Tuple[Tuple[str, str], ...]:
+    """
+    生成 K 线请求参数
+
+    """
+    params = EASTMONEY_KLINE_BASE_PARAMS + (
+        ('beg', beg),
+        ('end', end),
+        ('secid', quote_id),
+        ('klt', f'{klt}'),
+        ('fqt', f'{fqt}'),
+    )
+    return params
+
+
 @to_numeric
+def build_kline_frame(klines: List[str], name: str, code: str) -> pd.DataFrame:
+    """
+    由原始 K 线行构造 DataFrame
+
+    """
+    # NOTE 原始行情是纯 CSV 行 直接交给 pandas 的 C 解析器
+    # 一次完成切分和数值类型推断 避免构造中间的字符串列表
+    df = pd.read_csv(
+        io.StringIO('\n'.join(klines)), header=None, names=EASTMONEY_KLINE_COLUMNS
+    )
+    df.insert(0, '代码', code)
+    df.insert(0, '名称', name)
+    return df
+
+
+def parse_kline_json(json_response: dict, quote_id: str) -> pd.DataFrame:
+    """
+    将 K 线接口返回的 json 数据转为 DataFrame
+
+    """
+    # NOTE 返回结构固定 直接按键取值即可 jsonpath 的全树扫描在多代码场景下开销明显
+    data: dict = json_response.get('data') or {}
+    klines: List[str] = data.get('klines')
+    if not klines:
+        return pd.DataFrame(columns=EASTMONEY_KLINE_FULL_COLUMNS)
+
+    name = data['name']
+    code = quote_id.split('.')[-1]
+    return build_kline_frame(klines, name, code)
+
+
 def get_quote_history_single(
     code: str,
     beg: str = '19000101',
@@ -81,43 +282,70 @@ def get_quote_history_single(
 
     """
 
-    fields = list(EASTMONEY_KLINE_FIELDS.keys())
-    columns = list(EASTMONEY_KLINE_FIELDS.values())
-    fields2 = ",".join(fields)
     if kwargs.get(MagicConfig.QUOTE_ID_MODE):
         quote_id = code
     else:
         quote_id = get_quote_id(code)
-    params = (
-        ('fields1', 'f1,f2,f3,f4,f5,f6,f7,f8,f9,f10,f11,f12,f13'),
-        ('fields2', fields2),
-        ('beg', beg),
-        ('end', end),
-        ('rtntype', '6'),
-        ('secid', quote_id),
-        ('klt', f'{klt}'),
-        ('fqt', f'{fqt}'),
-    )
-
-    url = 'https://push2his.eastmoney.com/api/qt/stock/kline/get'
-
+    # NOTE 结束日期已成历史且复权方式固定的窗口不会再变化 可直接读写磁盘缓存
+    use_cache = is_immutable_kline_window(end, fqt)
+    if use_cache:
+        cached = load_klines(quote_id, klt, fqt, beg, end)
+        if cached is not None:
+            name, klines = cached
+            return build_kline_frame(klines, name, quote_id.split('.')[-1])
+    params = gen_kline_params(quote_id, beg, end, klt, fqt)
     json_response = session.get(
-        url, headers=EASTMONEY_REQUEST_HEADERS, params=params, verify=False
+        EASTMONEY_KLINE_URL,
+        headers=EASTMONEY_REQUEST_HEADERS,
+        params=params,
+        verify=False,
     ).json()
-    klines: List[str] = jsonpath(json_response, '$..klines[:]')
-    if not klines:
-        columns.insert(0, '代码')
-        columns.insert(0, '名称')
-        return pd.DataFrame(columns=columns)
+    if use_cache:
+        data = json_response.get('data') or {}
+        klines = data.get('klines')
+        if klines:
+            save_klines(quote_id, klt, fqt, beg, end, data['name'], klines)
+    return parse_kline_json(json_response, quote_id)
 
-    rows = [kline.split(',') for kline in klines]
-    name = json_response['data']['name']
-    code = quote_id.split('.')[-1]
-    df = pd.DataFrame(rows, columns=columns)
-    df.insert(0, '代码', code)
-    df.insert(0, '名称', name)
 
-    return df
+async def get_quote_history_single_async(
+    client: aiohttp.ClientSession,
+    semaphore: asyncio.Semaphore,
+    code: str,
+    beg: str = '19000101',
+    end: str = '20500101',
+    klt: int = 101,
+    fqt: int = 1,
+    tries: int = 3,
+    **kwargs,
+) -> Tuple[str, pd.DataFrame]:
+    """
+    获取单只股票、债券 K 线数据(协程版本)
+
+    """
+    if kwargs.get(MagicConfig.QUOTE_ID_MODE):
+        quote_id = code
+    else:
+        # NOTE 行情ID搜索涉及阻塞的网络请求 放入线程池以免阻塞事件循环
+        loop = asyncio.get_event_loop()
+        quote_id = await loop.run_in_executor(None, get_quote_id, code)
+    use_cache = is_immutable_kline_window(end, fqt)
+    if use_cache:
+        cached = load_klines(quote_id, klt, fqt, beg, end)
+        if cached is not None:
+            name, klines = cached
+            return code, build_kline_frame(klines, name, quote_id.split('.')[-1])
+    params = gen_kline_params(quote_id, beg, end, klt, fqt)
+    async with semaphore:
+        json_response = await fetch_json(
+            client, EASTMONEY_KLINE_URL, params, tries=tries
+        )
+    if use_cache:
+        data = json_response.get('data') or {}
+        klines = data.get('klines')
+        if klines:
+            save_klines(quote_id, klt, fqt, beg, end, data['name'], klines)
+    return code, parse_kline_json(json_response, quote_id)
 
 
 def get_quote_history_multi(
@@ -133,27 +361,47 @@ def get_quote_history_multi(
     获取多只股票、债券历史行情信息
 
     """
-
-    dfs: Dict[str, pd.DataFrame] = {}
-    total = len(codes)
-
-    @multitasking.task
-    @retry(tries=tries, delay=1)
-    def start(code: str):
-        _df = get_quote_history_single(
-            code, beg=beg, end=end, klt=klt, fqt=fqt, **kwargs
-        )
-        dfs[code] = _df
-        pbar.update(1)
-        pbar.set_description_str(f'Processing => {code}')
-
-    pbar = tqdm(total=total)
-    for code in codes:
-        if len(multitasking.get_active_tasks()) > MAX_CONNECTIONS:
-            time.sleep(3)
-        start(code)
-    multitasking.wait_for_tasks()
-    pbar.close()
+    # NOTE 去重并保留原有顺序 重复代码只请求一次
+    codes = list(dict.fromkeys(codes))
+
+    async def gather() -> Dict[str, pd.DataFrame]:
+        dfs: Dict[str, pd.DataFrame] = {}
+        semaphore = asyncio.Semaphore(MAX_CONNECTIONS)
+        pbar = tqdm(total=len(codes))
+        async with new_client_session() as client:
+            tasks = [
+                asyncio.ensure_future(
+                    get_quote_history_single_async(
+                        client,
+                        semaphore,
+                        code,
+                        beg=beg,
+                        end=end,
+                        klt=klt,
+                        fqt=fqt,
+                        tries=tries,
+                        **kwargs,
+                    )
+                )
+                for code in codes
+            ]
+            # NOTE 进度条按批刷新 高并发下逐任务刷新会在终端输出上互相争抢
+            flush_every = 50
+            pending = 0
+            for task in asyncio.as_completed(tasks):
+                code, _df = await task
+                dfs[code] = _df
+                pending += 1
+                if pending >= flush_every:
+                    pbar.set_description_str(f'Processing => {code}')
+                    pbar.update(pending)
+                    pending = 0
+            if pending:
+                pbar.update(pending)
+        pbar.close()
+        return dfs
+
+    dfs = run_coroutine(gather())
     if kwargs.get(MagicConfig.RETURN_DF):
         return pd.concat(dfs, axis=0, ignore_index=True)
     return dfs
@@ -237,31 +485,24 @@ def get_history_bill(code: str) -> pd.DataFrame:
 
     """
 
-    fields = list(EASTMONEY_HISTORY_BILL_FIELDS.keys())
-    columns = list(EASTMONEY_HISTORY_BILL_FIELDS.values())
-    fields2 = ",".join(fields)
     quote_id = get_quote_id(code)
-    params = (
-        ('lmt', '100000'),
-        ('klt', '101'),
-        ('secid', quote_id),
-        ('fields1', 'f1,f2,f3,f7'),
-        ('fields2', fields2),
-    )
+    params = EASTMONEY_HISTORY_BILL_BASE_PARAMS + (('secid', quote_id),)
     url = 'http://push2his.eastmoney.com/api/qt/stock/fflow/daykline/get'
     json_response = session.get(
         url, headers=EASTMONEY_REQUEST_HEADERS, params=params
     ).json()
 
-    klines: List[str] = jsonpath(json_response, '$..klines[:]')
+    data: dict = json_response.get('data') or {}
+    klines: List[str] = data.get('klines')
     if not klines:
-        columns.insert(0, '代码')
-        columns.insert(0, '名称')
-        return pd.DataFrame(columns=columns)
-    rows = [kline.split(',') for kline in klines]
-    name = jsonpath(json_response, '$..name')[0]
+        return pd.DataFrame(columns=EASTMONEY_HISTORY_BILL_FULL_COLUMNS)
+    name = data['name']
     code = quote_id.split('.')[-1]
-    df = pd.DataFrame(rows, columns=columns)
+    df = pd.read_csv(
+        io.StringIO('\n'.join(klines)),
+        header=None,
+        names=EASTMONEY_HISTORY_BILL_COLUMNS,
+    )
     df.insert(0, '代码', code)
     df.insert(0, '名称', name)
 
@@ -285,47 +526,43 @@ def get_today_bill(code: str) -> pd.DataFrame:
 
     """
     quote_id = get_quote_id(code)
-    params = (
-        ('lmt', '0'),
-        ('klt', '1'),
-        ('secid', quote_id),
-        ('fields1', 'f1,f2,f3,f7'),
-        ('fields2', 'f51,f52,f53,f54,f55,f56,f57,f58,f59,f60,f61,f62,f63'),
-    )
+    params = EASTMONEY_TODAY_BILL_BASE_PARAMS + (('secid', quote_id),)
     url = 'http://push2.eastmoney.com/api/qt/stock/fflow/kline/get'
     json_response = session.get(
         url, headers=EASTMONEY_REQUEST_HEADERS, params=params
     ).json()
-    columns = ['时间', '主力净流入', '小单净流入', '中单净流入', '大单净流入', '超大单净流入']
-    name = jsonpath(json_response, '$..name')[0]
+    data: dict = json_response.get('data') or {}
+    name = data.get('name')
     code = quote_id.split('.')[-1]
-    klines: List[str] = jsonpath(json_response, '$..klines[:]')
+    klines: List[str] = data.get('klines')
     if not klines:
-        columns.insert(0, '代码')
-        columns.insert(0, '名称')
-        return pd.DataFrame(columns=columns)
-    rows = [kline.split(',') for kline in klines]
-    df = pd.DataFrame(rows, columns=columns)
+        return pd.DataFrame(columns=EASTMONEY_TODAY_BILL_FULL_COLUMNS)
+    df = pd.read_csv(
+        io.StringIO('\n'.join(klines)), header=None, names=EASTMONEY_TODAY_BILL_COLUMNS
+    )
     df.insert(0, '代码', code)
     df.insert(0, '名称', name)
     return df
 
 
+EASTMONEY_BASE_INFO_URL = 'http://push2.eastmoney.com/api/qt/stock/get'
+
+
+def gen_base_info_params(quote_id: str) -> Tuple[Tuple[str, str], ...]:
+    """
+    生成基本信息请求参数
+
+    """
+    params = EASTMONEY_BASE_INFO_BASE_PARAMS + (('secid', quote_id),)
+    return params
+
+
 @to_numeric
-def get_base_info(quote_id: str) -> pd.Series:
+def parse_base_info_json(json_response: dict) -> pd.Series:
+    """
+    将基本信息接口返回的 json 数据转为 Series
 
-    fields = ",".join(EASTMONEY_BASE_INFO_FIELDS.keys())
-    params = (
-        ('ut', 'fa5fd1943c7b386f172d6893dbfba10b'),
-        ('invt', '2'),
-        ('fltt', '2'),
-        ('fields', fields),
-        ('secid', quote_id),
-    )
-    url = 'http://push2.eastmoney.com/api/qt/stock/get'
-    json_response = session.get(
-        url, headers=EASTMONEY_REQUEST_HEADERS, params=params
-    ).json()
+    """
     items = json_response['data']
     if not items:
         return pd.Series(index=EASTMONEY_BASE_INFO_FIELDS.values(), dtype='object')
@@ -334,6 +571,29 @@ def get_base_info(quote_id: str) -> pd.Series:
     return s
 
 
+def get_base_info(quote_id: str) -> pd.Series:
+
+    params = gen_base_info_params(quote_id)
+    json_response = session.get(
+        EASTMONEY_BASE_INFO_URL, headers=EASTMONEY_REQUEST_HEADERS, params=params
+    ).json()
+    return parse_base_info_json(json_response)
+
+
+async def get_base_info_async(
+    client: aiohttp.ClientSession, quote_id: str, tries: int = 3
+) -> pd.Series:
+    """
+    获取股票、债券基本信息(协程版本)
+
+    """
+    params = gen_base_info_params(quote_id)
+    json_response = await fetch_json(
+        client, EASTMONEY_BASE_INFO_URL, params, tries=tries
+    )
+    return parse_base_info_json(json_response)
+
+
 @to_numeric
 def get_deal_detail(quote_id: str, max_count: int = 1000000) -> pd.DataFrame:
     """
@@ -375,11 +635,16 @@ def get_deal_detail(quote_id: str, max_count: int = 1000000) -> pd.DataFrame:
 
     js: dict = response.json()
     lines: List[str] = js['data']['details']
-    rows = [line.split(',')[:4] for line in lines]
-    df = pd.DataFrame(columns=columns, index=range(len(rows)))
+    df = pd.DataFrame(columns=columns, index=range(len(lines)))
     df.loc[:, '代码'] = code
     df.loc[:, '名称'] = name
-    detail_df = pd.DataFrame(rows, columns=['时间', '成交价', '成交量', '单数'])
+    # NOTE 用 C 解析器切分成交明细行 usecols 跳过行尾多余字段 免去逐行 split 再切片
+    detail_df = pd.read_csv(
+        io.StringIO('\n'.join(lines)),
+        header=None,
+        usecols=[0, 1, 2, 3],
+        names=['时间', '成交价', '成交量', '单数'],
+    )
     detail_df.insert(1, '昨收', js['data']['prePrice'])
     df.loc[:, detail_df.columns] = detail_df.values
     return df
@@ -414,22 +679,22 @@ def get_latest_quote(quote_id_list: Union[str, List[str]], **kwargs) -> pd.DataF
 
     columns = {**EASTMONEY_QUOTE_FIELDS, **kwargs.get(MagicConfig.EXTRA_FIELDS, {})}
     fields = ",".join(columns.keys())
-    params = (
-        ('OSVersion', '14.3'),
-        ('appVersion', '6.3.8'),
-        ('fields', fields),
-        ('fltt', '2'),
-        ('plat', 'Iphone'),
-        ('product', 'EFund'),
-        ('secids', ",".join(secids)),
-        ('serverVersion', '6.3.6'),
-        ('version', '6.3.8'),
-    )
     url = 'https://push2.eastmoney.com/api/qt/ulist.np/get'
-    json_response = session.get(
-        url, headers=EASTMONEY_REQUEST_HEADERS, params=params
-    ).json()
-    rows = jsonpath(json_response, '$..diff[:]')
+    # NOTE 行情ID过多时拼出的 secids 会超出 URL 长度限制 接口静默返回空数据
+    # 分批请求后合并 再一次性构造 DataFrame
+    batch_size = 500
+    rows: List[dict] = []
+    for start in range(0, len(secids), batch_size):
+        params = EASTMONEY_ULIST_BASE_PARAMS + (
+            ('fields', fields),
+            ('secids', ",".join(secids[start : start + batch_size])),
+        )
+        json_response = session.get(
+            url, headers=EASTMONEY_REQUEST_HEADERS, params=params
+        ).json()
+        batch_rows = (json_response.get('data') or {}).get('diff')
+        if batch_rows:
+            rows.extend(batch_rows)
     if not rows:
         df = pd.DataFrame(columns=columns.values())
     else:
@@ -464,19 +729,12 @@ def get_latest_ndays_quote(code: str, ndays: int = 1, **kwargs) -> pd.DataFrame:
         股票、期货、债券的最近 ndays 天的1分钟K线行情
     """
     # TODO 考虑如何解决 ndays 不为 1 时，第一天开盘价为 0 的问题
-    fields = list(EASTMONEY_KLINE_NDAYS_FIELDS.keys())
-    columns = list(EASTMONEY_KLINE_NDAYS_FIELDS.values())
-    fields2 = ",".join(fields)
     if kwargs.get(MagicConfig.QUOTE_ID_MODE):
         quote_id = code
     else:
         quote_id = get_quote_id(code)
-    params = (
-        ('fields1', 'f1,f2,f3,f4,f5,f6,f7,f8,f9,f10,f11,f12,f13'),
-        ('fields2', fields2),
+    params = EASTMONEY_KLINE_NDAYS_BASE_PARAMS + (
         ('ndays', ndays),
-        ('iscr', '0'),
-        ('iscca', '0'),
         ('secid', quote_id),
     )
 
@@ -484,16 +742,18 @@ def get_latest_ndays_quote(code: str, ndays: int = 1, **kwargs) -> pd.DataFrame:
         'http://push2his.eastmoney.com/api/qt/stock/trends2/get', params=params
     ).json()
 
-    klines: List[str] = jsonpath(json_response, '$..trends[:]')
+    data: dict = json_response.get('data') or {}
+    klines: List[str] = data.get('trends')
     if not klines:
-        columns.insert(0, '代码')
-        columns.insert(0, '名称')
-        return pd.DataFrame(columns=columns)
+        return pd.DataFrame(columns=EASTMONEY_KLINE_NDAYS_FULL_COLUMNS)
 
-    rows = [kline.split(',') for kline in klines]
-    name = json_response['data']['name']
+    name = data['name']
     code = quote_id.split('.')[-1]
-    df = pd.DataFrame(rows, columns=columns)
+    df = pd.read_csv(
+        io.StringIO('\n'.join(klines)),
+        header=None,
+        names=EASTMONEY_KLINE_NDAYS_COLUMNS,
+    )
     df.insert(0, '代码', code)
     df.insert(0, '名称', name)
 
@@ -12,7 +12,6 @@ import rich
 from jsonpath import jsonpath
 from retry import retry
 from tqdm import tqdm
-import time
 
 from ..utils import to_numeric
 from .config import EastmoneyFundHeaders
@@ -106,18 +105,25 @@ def get_quote_history(fund_code: str, pz: int = 40000) -> pd.DataFrame:
 def get_quote_history_multi(fund_codes: List[str], pz: int = 40000, **kwargs) -> Dict[str, pd.DataFrame]:
     dfs: Dict[str, pd.DataFrame] = {}
     pbar = tqdm(total=len(fund_codes))
+    # NOTE 有界信号量在提交侧形成背压 满载时阻塞提交而不是轮询休眠
+    semaphore = threading.BoundedSemaphore(MAX_CONNECTIONS)
 
-    @multitasking.task
     @retry(tries=3, delay=1)
-    def start(fund_code: str):
-        if len(multitasking.get_active_tasks()) >= MAX_CONNECTIONS:
-            time.sleep(3)
+    def fetch(fund_code: str) -> None:
         _df = get_quote_history(fund_code, pz)
         dfs[fund_code] = _df
         pbar.update(1)
         pbar.set_description_str(f'Processing => {fund_code}')
 
+    @multitasking.task
+    def start(fund_code: str) -> None:
+        try:
+            fetch(fund_code)
+        finally:
+            semaphore.release()
+
     for f in fund_codes:
+        semaphore.acquire()
         start(f)
     multitasking.wait_for_tasks()
     pbar.close()
@@ -654,17 +660,25 @@ def get_base_info_muliti(fund_codes: List[str]) -> pd.Series:
     """
 
     ss = []
+    semaphore = threading.BoundedSemaphore(MAX_CONNECTIONS)
 
-    @multitasking.task
     @retry(tries=3, delay=1)
-    def start(fund_code: str) -> None:
+    def fetch(fund_code: str) -> None:
         s = get_base_info_single(fund_code)
         ss.append(s)
         pbar.update()
         pbar.set_description(f'Processing => {fund_code}')
 
+    @multitasking.task
+    def start(fund_code: str) -> None:
+        try:
+            fetch(fund_code)
+        finally:
+            semaphore.release()
+
     pbar = tqdm(total=len(fund_codes))
     for fund_code in fund_codes:
+        semaphore.acquire()
         start(fund_code)
     multitasking.wait_for_tasks()
     df = pd.DataFrame(ss)
@@ -2,27 +2,46 @@ import json
 from pathlib import Path
 from typing import Dict
 
+import orjson
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter, Retry
 
+from ..common.config import EASTMONEY_REQUEST_HEADERS
 from ..config import SEARCH_RESULT_CACHE_PATH, MAX_CONNECTIONS
 
 class CustomedSession(requests.Session):
     def request(self, *args, **kwargs):
         kwargs.setdefault('timeout', 180) # 3min
-        return super(CustomedSession, self).request(*args, **kwargs)
+        response = super(CustomedSession, self).request(*args, **kwargs)
+        default_json = response.json
+
+        def fast_json(**kw):
+            # orjson 直接解析响应字节流 跳过 response.text 的 UTF-8 解码拷贝
+            try:
+                return orjson.loads(response.content)
+            except orjson.JSONDecodeError:
+                # 个别接口返回非严格 JSON(例如 NaN 字面量) 回退到默认解析
+                return default_json(**kw)
+
+        response.json = fast_json
+        return response
 
 session = CustomedSession()
-adapter = requests.adapters.HTTPAdapter(pool_connections = MAX_CONNECTIONS,
-                                        pool_maxsize = MAX_CONNECTIONS,
-                                        max_retries = 5)
+adapter = HTTPAdapter(pool_connections = MAX_CONNECTIONS,
+                      pool_maxsize = MAX_CONNECTIONS,
+                      max_retries = Retry(total = 5, backoff_factor = 0.2))
 session.mount('http://', adapter)
 session.mount('https://', adapter)
+# 默认请求头只设置一次 单次调用仍可通过 headers 参数覆盖
+session.headers.update(EASTMONEY_REQUEST_HEADERS)
 
 # 关键词搜索缓存
 SEARCH_RESULT_DICT: Dict[str, dict] = dict()
 # 行情ID搜索缓存
 BASE_INFO_CACHE: Dict[str, pd.Series] = dict()
+# 证券代码 -> 行情ID 进程内缓存(行情ID 基本不会变化 只缓存成功的结果)
+QUOTE_ID_CACHE: Dict[str, str] = dict()
 path = Path(SEARCH_RESULT_CACHE_PATH)
 if path.exists():
     load_success = False
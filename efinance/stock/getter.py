@@ -1,12 +1,11 @@
+import asyncio
 import calendar
 import json
-import signal
 import sys
 from datetime import datetime, timedelta
 from typing import Dict, List, Union
 
-import threading
-import multitasking
+import aiohttp
 import numpy as np
 import pandas as pd
 import requests
@@ -22,7 +21,10 @@ from ..common import get_quote_history as get_quote_history_for_stock
 from ..common import get_realtime_quotes_by_fs
 from ..common import get_today_bill as get_today_bill_for_stock
 from ..common.config import EASTMONEY_REQUEST_HEADERS, FS_DICT, MagicConfig
+from ..common.getter import get_base_info_async as get_base_info_async_for_stock
 from ..common.getter import get_latest_quote as get_latest_quote_for_stock
+from ..common.getter import fetch_json, new_client_session, run_coroutine
+from ..config import MAX_CONNECTIONS
 from ..shared import session
 from ..utils import (
     get_quote_id,
@@ -36,8 +38,8 @@ from .config import (
     EASTMONEY_STOCK_DAILY_BILL_BOARD_FIELDS,
 )
 
-if threading.current_thread() is threading.main_thread():
-    signal.signal(signal.SIGINT, multitasking.killall)
+# 基本信息表头由字段映射在模块加载时计算一次
+EASTMONEY_STOCK_BASE_INFO_COLUMNS = tuple(EASTMONEY_STOCK_BASE_INFO_FIELDS.values())
 
 python_version = sys.version_info.major, sys.version_info.minor
 # * 适配 pythn 3.10 及其以上版本
@@ -63,12 +65,29 @@ def get_base_info_single(stock_code: str) -> pd.Series:
     """
     secid = get_quote_id(stock_code)
     if not secid:
-        return pd.Series(
-            index=EASTMONEY_STOCK_BASE_INFO_FIELDS.values(), dtype='object'
-        )
+        return pd.Series(index=EASTMONEY_STOCK_BASE_INFO_COLUMNS, dtype='object')
     return get_base_info_for_stock(secid).rename(index={'代码': '股票代码', '名称': '股票名称'})
 
 
+async def get_base_info_single_async(
+    client: aiohttp.ClientSession,
+    semaphore: asyncio.Semaphore,
+    stock_code: str,
+) -> pd.Series:
+    """
+    获取单股票基本信息(协程版本)
+
+    """
+    # NOTE 行情ID搜索涉及阻塞的网络请求 放入线程池以免阻塞事件循环
+    loop = asyncio.get_event_loop()
+    secid = await loop.run_in_executor(None, get_quote_id, stock_code)
+    if not secid:
+        return pd.Series(index=EASTMONEY_STOCK_BASE_INFO_COLUMNS, dtype='object')
+    async with semaphore:
+        s = await get_base_info_async_for_stock(client, secid)
+    return s.rename(index={'代码': '股票代码', '名称': '股票名称'})
+
+
 def get_base_info_muliti(stock_codes: List[str]) -> pd.DataFrame:
     """
     获取股票多只基本信息
@@ -83,22 +102,40 @@ def get_base_info_muliti(stock_codes: List[str]) -> pd.DataFrame:
     DataFrame
         多只股票基本信息
     """
-
-    @multitasking.task
-    @retry(tries=3, delay=1)
-    def start(stock_code: str):
-        s = get_base_info_single(stock_code)
-        series.append(s)
-        pbar.update()
-        pbar.set_description(f'Processing => {stock_code}')
-
-    series: List[pd.Series] = []
-    pbar = tqdm(total=len(stock_codes))
-    for stock_code in stock_codes:
-        start(stock_code)
-    multitasking.wait_for_tasks()
-    df = pd.DataFrame(series)
-    df = df.dropna(subset=['股票代码'])
+    # NOTE 去重并保留原有顺序 重复代码只请求一次
+    stock_codes = list(dict.fromkeys(stock_codes))
+
+    async def gather() -> List[pd.Series]:
+        series: List[pd.Series] = []
+        semaphore = asyncio.Semaphore(MAX_CONNECTIONS)
+        pbar = tqdm(total=len(stock_codes))
+        async with new_client_session() as client:
+            tasks = [
+                asyncio.ensure_future(
+                    get_base_info_single_async(client, semaphore, stock_code)
+                )
+                for stock_code in stock_codes
+            ]
+            # NOTE 进度条按批刷新 高并发下逐任务刷新会在终端输出上互相争抢
+            flush_every = 50
+            pending = 0
+            for task in asyncio.as_completed(tasks):
+                s = await task
+                series.append(s)
+                pending += 1
+                if pending >= flush_every:
+                    pbar.set_description(f'Processing => {s["股票代码"]}')
+                    pbar.update(pending)
+                    pending = 0
+            if pending:
+                pbar.update(pending)
+        pbar.close()
+        return series
+
+    series = run_coroutine(gather())
+    # NOTE 生成器边过滤边喂给构造器 搜索失败的空结果不会先进入 DataFrame 再被 dropna 剔除
+    rows = (s for s in series if not pd.isna(s['股票代码']))
+    df = pd.DataFrame(rows, columns=EASTMONEY_STOCK_BASE_INFO_COLUMNS)
     return df
 
 
@@ -566,7 +603,7 @@ def get_top10_stock_holder_info(stock_code: str, top: int = 4) -> pd.DataFrame:
         fc = gen_fc(stock_code)
         data = {"fc": fc}
         url = 'https://emh5.eastmoney.com/api/GuBenGuDong/GetFirstRequest2Data'
-        json_response = requests.post(url, json=data).json()
+        json_response = session.post(url, json=data).json()
         dates = jsonpath(json_response, f'$..BaoGaoQi')
         if not dates:
             return []
@@ -583,26 +620,35 @@ def get_top10_stock_holder_info(stock_code: str, top: int = 4) -> pd.DataFrame:
     quote_id = get_quote_id(stock_code)
     stock_code = quote_id.split('.')[-1]
     fc = gen_fc(stock_code)
-    dates = get_public_dates(stock_code)
+    dates = get_public_dates(stock_code)[:top]
     dfs: List[pd.DataFrame] = []
-    empty_df = pd.DataFrame(columns=['股票代码', '日期'] + list(fields.values()))
 
-    for date in dates[:top]:
-        data = {"fc": fc, "BaoGaoQi": date}
+    async def gather() -> List[dict]:
         url = 'https://emh5.eastmoney.com/api/GuBenGuDong/GetShiDaLiuTongGuDong'
-        response = requests.post(url, json=data)
-        response.encoding = 'utf-8'
-        items: List[dict] = jsonpath(response.json(), f'$..ShiDaLiuTongGuDongList[:]')
+        async with new_client_session() as client:
+            tasks = [
+                fetch_json(
+                    client, url, json={"fc": fc, "BaoGaoQi": date}, method='POST'
+                )
+                for date in dates
+            ]
+            # NOTE gather 保持与报告期相同的顺序 并发请求各期数据
+            return await asyncio.gather(*tasks)
+
+    for date, json_response in zip(dates, run_coroutine(gather())):
+        items: List[dict] = jsonpath(json_response, f'$..ShiDaLiuTongGuDongList[:]')
         if not items:
             continue
-        df = pd.DataFrame(items)
+        # NOTE 构造时就只挑选需要的字段 多余的 IsLink 等列不再进入 DataFrame
+        df = pd.DataFrame(items, columns=list(fields.keys()))
         df.rename(columns=fields, inplace=True)
-        df.insert(0, '股票代码', [stock_code for _ in range(len(df))])
-        df.insert(1, '更新日期', [date for _ in range(len(df))])
-        del df['IsLink']
+        # NOTE 标量 insert 由 pandas 自行广播 不必构造与行数等长的列表
+        df.insert(0, '股票代码', stock_code)
+        df.insert(1, '更新日期', date)
         dfs.append(df)
     if len(dfs) == 0:
-        return empty_df
+        return pd.DataFrame(columns=['股票代码', '日期'] + list(fields.values()))
+    # NOTE 各期数据只在此处一次性拼接 Copy-on-Write 下 concat 默认即为惰性拷贝
     return pd.concat(dfs, axis=0, ignore_index=True)
 
 
@@ -669,7 +715,7 @@ def get_all_report_dates() -> pd.DataFrame:
         ('ps', '2000'),
     )
     url = 'https://datacenter.eastmoney.com/securities/api/data/get'
-    response = requests.get(url, headers=EASTMONEY_REQUEST_HEADERS, params=params)
+    response = session.get(url, headers=EASTMONEY_REQUEST_HEADERS, params=params)
     items = jsonpath(response.json(), '$..data[:]')
     if not items:
         pd.DataFrame(columns=fields.values())
@@ -1125,7 +1171,7 @@ def get_members(index_code: str) -> pd.DataFrame:
                 ('ServerVersion', '6.9.9'),
             )
             url = 'https://fundztapi.eastmoney.com/FundSpecialApiNew/FundSpecialZSB30ZSCFG'
-            json_response = requests.get(
+            json_response = session.get(
                 url, params=params, headers=EASTMONEY_REQUEST_HEADERS
             ).json()
             items = json_response['Datas']
@@ -1197,7 +1243,7 @@ def get_latest_ipo_info() -> pd.DataFrame:
             ('client', 'WEB'),
         )
         url = 'http://datacenter-web.eastmoney.com/api/data/get'
-        json_response = requests.get(
+        json_response = session.get(
             url, headers=EASTMONEY_REQUEST_HEADERS, params=params
         ).json()
         items = jsonpath(json_response, '$..data[:]')
@@ -1275,7 +1321,7 @@ def get_quote_snapshot(stock_code: str) -> pd.Series:
         ('callback', 'jQuery183026310160411569883_1646052793441'),
     )
 
-    response = requests.get(
+    response = session.get(
         'https://hsmarketwg.eastmoney.com/api/SHSZQuoteSnapshot', params=params
     )
     start_index = response.text.find('{')
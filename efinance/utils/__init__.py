@@ -1,5 +1,7 @@
+import atexit
 import json
 import re
+import threading
 import time
 from collections import OrderedDict, namedtuple
 from functools import wraps
@@ -11,7 +13,7 @@ from retry.api import retry
 
 from ..common.config import FS_DICT, MARKET_NUMBER_DICT
 from ..config import SEARCH_RESULT_CACHE_PATH
-from ..shared import SEARCH_RESULT_DICT, session
+from ..shared import QUOTE_ID_CACHE, SEARCH_RESULT_DICT, session
 
 # 函数变量
 F = TypeVar('F')
@@ -103,8 +105,13 @@ def get_quote_id(stock_code: str) -> str:
     """
     if len(str(stock_code).strip()) == 0:
         raise Exception('证券代码应为长度不应为 0')
+    # NOTE 多任务场景里同一批代码会反复查询 命中进程内缓存即可直接返回
+    quote_id = QUOTE_ID_CACHE.get(stock_code)
+    if quote_id:
+        return quote_id
     quote = search_quote(stock_code)
     if isinstance(quote, Quote):
+        QUOTE_ID_CACHE[stock_code] = quote.quote_id
         return quote.quote_id
     if quote is None:
         rich.print(f'证券代码 "{stock_code}" 可能有误')
@@ -188,9 +195,16 @@ def search_quote_locally(keyword: str) -> Union[Quote, None]:
     return quote
 
 
+# 搜索结果内存缓存是否有待落盘的改动
+_search_result_dirty = False
+_search_result_flush_lock = threading.Lock()
+
+
 def save_search_result(keyword: str, quotes: List[Quote]):
     """
-    存储搜索结果到文件中
+    存储搜索结果
+
+    仅更新内存缓存并标记待落盘 磁盘写入由 ``flush_search_result`` 统一完成
 
     Parameters
     ----------
@@ -199,15 +213,36 @@ def save_search_result(keyword: str, quotes: List[Quote]):
     quotes : List[Quote]
         搜索结果
     """
-    with open(SEARCH_RESULT_CACHE_PATH, 'w', encoding='utf-8') as f:
-        # TODO考虑如何存储多个搜索结果
-        for quote in quotes:
-            now = time.time()
-            d = dict(quote._asdict())
-            d['last_time'] = now
-            SEARCH_RESULT_DICT[keyword] = d
-            break
-        json.dump(SEARCH_RESULT_DICT.copy(), f)
+    global _search_result_dirty
+    # TODO考虑如何存储多个搜索结果
+    for quote in quotes:
+        now = time.time()
+        d = dict(quote._asdict())
+        d['last_time'] = now
+        SEARCH_RESULT_DICT[keyword] = d
+        break
+    # NOTE 批量拉取时每个新代码都会走到这里 把整个字典的 json 序列化
+    # 和磁盘写入移出热路径 仅标记有改动 进程退出时统一落盘
+    _search_result_dirty = True
+
+
+def flush_search_result() -> None:
+    """
+    将内存中的搜索结果缓存写入文件
+
+    正常情况下无需手动调用 进程退出时会自动执行
+
+    """
+    global _search_result_dirty
+    with _search_result_flush_lock:
+        if not _search_result_dirty:
+            return
+        with open(SEARCH_RESULT_CACHE_PATH, 'w', encoding='utf-8') as f:
+            json.dump(SEARCH_RESULT_DICT.copy(), f)
+        _search_result_dirty = False
+
+
+atexit.register(flush_search_result)
 
 
 def rename_dataframe_and_series(
@@ -4,7 +4,17 @@ from setuptools import find_packages, setup
 
 here = pathlib.Path(__file__).parent
 # require = (here / "requirements.txt").read_text(encoding='utf-8').split()
-require = ['requests', 'rich', 'jsonpath', 'pandas', 'tqdm', 'retry', 'multitasking']
+require = [
+    'requests',
+    'aiohttp',
+    'orjson',
+    'rich',
+    'jsonpath',
+    'pandas',
+    'tqdm',
+    'retry',
+    'multitasking',
+]
 readme = (here / "README.md").read_text(encoding='utf-8')
 about = {}
 exec((here / 'efinance' / '__version__.py').read_text(encoding='utf-8'), about)